@@ -0,0 +1,36 @@
+"""Тесты бэкенда на временной SQLite-базе: python -m pytest backend/tests"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="uchet_pu_tests_"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ.setdefault("EXPORT_DIR", os.path.join(os.path.dirname(_DB_PATH), "exports"))
+os.environ.setdefault("EXPORT_CACHE_DIR", os.path.join(os.path.dirname(_DB_PATH), "export_cache"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as c:  # startup: схема и начальные данные
+        yield c
+
+
+@pytest.fixture
+def db(client):
+    session = main.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def admin_headers(client, db):
+    admin = db.query(main.User).filter(main.User.username == "admin").one()
+    return {"Authorization": f"Bearer {main.create_token(admin.id)}"}
@@ -0,0 +1,133 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+import pytest
+
+import main
+
+
+def test_pu_export_parquet_keeps_column_types(client, db, admin_headers):
+    pq = pytest.importorskip("pyarrow.parquet")
+    sue = db.query(main.Unit).filter(main.Unit.code == "SUE").one()
+    item = main.PUItem(
+        serial_number="PARQUET-001", pu_type="Меркурий 230", current_unit_id=sue.id,
+        faza="3ф", voltage="0.4", power=15.5, smr_date=date(2024, 3, 1),
+    )
+    db.add(item)
+    db.commit()
+
+    response = client.get("/api/pu/export", params={"format": "parquet", "search": "PARQUET-001"}, headers=admin_headers)
+    assert response.status_code == 200
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert str(table.schema.field("power").type) == "double"
+    row = table.to_pylist()[0]
+    assert row["serial_number"] == "PARQUET-001"
+    assert row["power"] == 15.5
+    assert row["faza"] == "3ф"
+    assert row["voltage"] == "0.4"
+    assert row["smr_date"] == date(2024, 3, 1)
+    assert row["created_at"] is not None
+
+
+def test_startup_sweeps_stale_export_files(client):
+    export_dir = main.export_job_dir()
+    stale = os.path.join(export_dir, "stale.xlsx")
+    fresh = os.path.join(export_dir, "fresh.xlsx")
+    for path in (stale, fresh):
+        with open(path, "wb") as f:
+            f.write(b"x")
+    old = time.time() - main.settings.EXPORT_JOB_TTL - 60
+    os.utime(stale, (old, old))
+
+    main.sweep_export_dir()
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+    os.unlink(fresh)
+
+
+def test_export_data_version_sees_change_behind_max_updated_at(client, db):
+    late = datetime(2024, 5, 1, 12, 0)
+    first = main.PUItem(serial_number="CACHE-001", tz_number="TZ-CACHE", updated_at=datetime(2024, 5, 1, 9, 0))
+    second = main.PUItem(serial_number="CACHE-002", tz_number="TZ-CACHE", updated_at=late)
+    db.add_all([first, second])
+    db.commit()
+    params = {"tz_number": "TZ-CACHE"}
+    before = main.export_data_version(db, "tz", params)
+
+    # Транзакция, начатая до последней выгрузки: updated_at меньше текущего максимума
+    db.query(main.PUItem).filter(main.PUItem.id == first.id).update(
+        {"faza": "1ф", "updated_at": datetime(2024, 5, 1, 10, 0)}, synchronize_session=False
+    )
+    db.commit()
+
+    assert main.export_data_version(db, "tz", params) != before
+
+
+def test_startup_sweeps_cache_dirs_of_dead_processes(client):
+    base = main.export_cache_base_dir()
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    stale = os.path.join(base, str(dead.pid))
+    live = os.path.join(base, str(os.getppid()))
+    for path in (stale, live):
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "book.xlsx"), "wb") as f:
+            f.write(b"x")
+
+    main.sweep_export_cache_dir()
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(live)
+    shutil.rmtree(live)
+
+
+def test_export_job_round_trip(client, admin_headers):
+    job = client.post("/api/exports", json={"kind": "pu", "params": {"format": "csv"}}, headers=admin_headers).json()
+    deadline = time.time() + 30
+    while job["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/api/exports/{job['id']}", headers=admin_headers).json()
+    assert job["status"] == "done", job
+
+    response = client.get(f"/api/exports/{job['id']}/download", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.content.startswith(b"\xef\xbb\xbf")
+    assert job["id"] in [j["id"] for j in client.get("/api/exports", headers=admin_headers).json()]
+
+
+def make_foreign_job(db, status: str, pid: int) -> main.ExportJob:
+    """Состояние выгрузки, записанное другим воркером"""
+    admin = db.query(main.User).filter(main.User.username == "admin").one()
+    job = main.ExportJob("pu", admin.id, {"format": "csv"}, "pu.csv", "Реестр.csv", main.EXPORT_FORMATS["csv"])
+    job.status = status
+    job.pid = pid
+    with open(job.path, "wb") as f:
+        f.write(b"serial;type\n")
+    job.save()
+    return job
+
+
+def test_export_job_of_another_worker_is_visible(client, db, admin_headers):
+    job = make_foreign_job(db, "done", os.getppid())
+
+    assert client.get(f"/api/exports/{job.id}", headers=admin_headers).json()["status"] == "done"
+    response = client.get(f"/api/exports/{job.id}/download", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.content == b"serial;type\n"
+
+
+def test_export_job_of_exited_worker_is_reported_as_error(client, db, admin_headers):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    job = make_foreign_job(db, "running", dead.pid)
+
+    state = client.get(f"/api/exports/{job.id}", headers=admin_headers).json()
+    assert state["status"] == "error"
+    assert client.get(f"/api/exports/{job.id}/download", headers=admin_headers).status_code == 400
@@ -0,0 +1,34 @@
+import io
+
+import openpyxl
+
+import main
+
+
+def xlsx(rows) -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def test_upload_register_with_duplicate_headers(client, db):
+    lab = db.query(main.User).filter(main.User.username == "lab").one()
+    headers = {"Authorization": f"Bearer {main.create_token(lab.id)}"}
+    # Две колонки «Тип»: в полном заголовке вторая — «Тип.1», берётся она
+    content = xlsx([
+        ["Тип", "Примечание", "Тип", "Заводской номер ПУ"],
+        ["старый", "-", "Меркурий 234", "DUP-0001"],
+        ["старый", "-", "Нева МТ 124", 12345678],
+    ])
+
+    response = client.post("/api/pu/upload", headers=headers, files={"file": ("dup.xlsx", content)})
+    assert response.status_code == 200, response.text
+
+    items = {i.serial_number: i.pu_type for i in db.query(main.PUItem).filter(
+        main.PUItem.serial_number.in_(["DUP-0001", "12345678"])
+    )}
+    assert items == {"DUP-0001": "Меркурий 234", "12345678": "Нева МТ 124"}
@@ -0,0 +1,57 @@
+"""Число SQL-запросов на запрос не зависит от размера страницы и числа строк (нет N+1)"""
+import pytest
+
+import main
+
+
+@pytest.fixture
+def query_count(client, monkeypatch):
+    monkeypatch.setattr(main.settings, "DEBUG_QUERY_COUNT", True)
+
+    def run(path, headers, **params):
+        response = client.get(path, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        return int(response.headers["X-DB-Queries"])
+
+    return run
+
+
+def test_pu_items_query_count_does_not_depend_on_page_size(query_count, db, admin_headers):
+    sue = db.query(main.Unit).filter(main.Unit.code == "SUE").one()
+    register = main.PURegister(filename="queries.xlsx", items_count=60)
+    db.add(register)
+    db.flush()
+    db.add_all([
+        main.PUItem(serial_number=f"QC-{i:03d}", current_unit_id=sue.id, register_id=register.id)
+        for i in range(60)
+    ])
+    db.commit()
+    query_count("/api/pu/items", admin_headers, size=1)  # прогрев кэшей пользователя и справочника
+
+    small = query_count("/api/pu/items", admin_headers, size=5)
+    large = query_count("/api/pu/items", admin_headers, size=50)
+    assert small == large
+
+
+def test_users_query_count_does_not_depend_on_user_count(query_count, db, admin_headers):
+    query_count("/api/users", admin_headers)
+    before = query_count("/api/users", admin_headers)
+
+    # У каждого своё подразделение: ленивая загрузка давала бы по запросу на пользователя
+    lab_role = db.query(main.Role).filter(main.Role.code == main.RoleCode.LAB_USER).one()
+    for i in range(10):
+        unit = main.Unit(name=f"Участок {i}", code=f"QC{i}", unit_type=main.UnitType.LAB)
+        db.add(unit)
+        db.flush()
+        db.add(main.User(username=f"qc_user_{i}", password_hash="x", full_name=f"Пользователь {i}",
+                         role_id=lab_role.id, unit_id=unit.id))
+    db.commit()
+
+    assert query_count("/api/users", admin_headers) == before
+
+
+def test_count_queries_counts_statements(db):
+    with main.count_queries() as counter:
+        db.query(main.Unit).all()
+        db.query(main.Role).all()
+    assert counter["count"] == 2
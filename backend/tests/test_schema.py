@@ -0,0 +1,17 @@
+import main
+
+
+def test_prepare_database_fills_new_status_counters(client, db, admin_headers):
+    sue = db.query(main.Unit).filter(main.Unit.code == "SUE").one()
+    db.add_all([main.PUItem(serial_number=f"CNT-{i:03d}", current_unit_id=sue.id) for i in range(5)])
+    db.commit()
+    total = db.query(main.PUItem).count()
+    db.close()
+
+    # База до появления счётчиков: таблицы нет, ПУ уже есть
+    main.PUStatusCounter.__table__.drop(bind=main.engine)
+    main.prepare_database()
+
+    assert db.query(main.PUStatusCounter).count() > 0
+    stats = client.get("/api/pu/dashboard", headers=admin_headers).json()
+    assert stats["all"]["total"] == total
@@ -0,0 +1,64 @@
+"""Разбор загрузок идёт в пуле потоков: пока импортируется файл, лёгкие запросы не ждут его окончания"""
+import io
+import statistics
+import threading
+import time
+
+import openpyxl
+
+import main
+
+UPLOAD_ROWS = 8000
+
+
+def make_register_xlsx(rows: int) -> bytes:
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Реестр")
+    ws.append(["Заводской номер ПУ", "Тип ПУ", "Подразделение"])
+    for i in range(rows):
+        ws.append([f"LAT{i:08d}", "Меркурий 230", "Лаборатория"])
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def timed_me(client, headers, user_id) -> float:
+    # Без кэша пользователя: /api/auth/me каждый раз идёт в БД
+    main.invalidate_principal(user_id)
+    started = time.perf_counter()
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    return time.perf_counter() - started
+
+
+def test_auth_me_is_not_blocked_by_upload(client, db):
+    lab = db.query(main.User).filter(main.User.username == "lab").one()
+    headers = {"Authorization": f"Bearer {main.create_token(lab.id)}"}
+    content = make_register_xlsx(UPLOAD_ROWS)
+    baseline = statistics.median(timed_me(client, headers, lab.id) for _ in range(10))
+
+    result = {}
+
+    def upload():
+        started = time.perf_counter()
+        result["response"] = client.post(
+            "/api/pu/upload", headers=headers,
+            files={"file": ("register.xlsx", content, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+        )
+        result["elapsed"] = time.perf_counter() - started
+
+    uploader = threading.Thread(target=upload)
+    uploader.start()
+    latencies = []
+    while uploader.is_alive():
+        latencies.append(timed_me(client, headers, lab.id))
+        time.sleep(0.01)
+    uploader.join()
+
+    assert result["response"].status_code == 200, result["response"].text
+    assert len(latencies) >= 3, f"upload {result['elapsed']:.2f}s"
+    # Если бы разбор шёл в цикле событий, запрос ждал бы его почти целиком. Пороги относительные:
+    # на загруженной машине медленнее становятся и загрузка, и базовый ответ
+    assert max(latencies) < result["elapsed"] / 2, \
+        f"max {max(latencies):.3f}s, upload {result['elapsed']:.2f}s"
+    assert statistics.median(latencies) < max(20 * baseline, 0.1), \
+        f"median {statistics.median(latencies):.3f}s, baseline {baseline:.3f}s"